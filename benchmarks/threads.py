@@ -0,0 +1,70 @@
+# multi-threaded from_dict/to_dict/from_json throughput from 1 to N threads. Run with a regular and a free-threaded
+# build to compare with and without the GIL, e.g.:
+#
+#   python benchmarks/threads.py --max_threads 8
+#   python3.13t benchmarks/threads.py --max_threads 8               # GIL disabled
+#   PYTHON_GIL=1 python3.13t benchmarks/threads.py --max_threads 8  # GIL re-enabled
+#
+# NOTE: msup is only verified to be thread-safe on GIL builds (see README), free-threaded numbers are experimental
+import sys
+import json
+import time
+import threading
+from dataclasses import dataclass, field
+from typing import Callable
+
+from msup.cli import cli, cliarg
+from msup.base import from_dict, to_dict, from_json
+
+@dataclass
+class Inner:
+    xs: list[float]
+    name: str = "inner"
+
+@dataclass
+class Payload:
+    a: int
+    b: float
+    inner: Inner | None = None
+    meta: dict[str, int] = field(default_factory=dict)
+    fn: Callable = "json.dumps"
+
+@dataclass
+class BenchArgs:
+    max_threads: int = cliarg(help="maximum number of threads", default=8)
+    n: int = cliarg(help="number of operations per thread", default=20000)
+
+def _work(n: int, barrier: threading.Barrier):
+    d = {"a": 1, "b": 2.5, "inner": {"xs": [1.0, 2.0, 3.0]}, "meta": {"k": 1}, "fn": "json.dumps"}
+    s = json.dumps(d)
+    barrier.wait()
+    for _ in range(n):
+        to_dict(from_dict(Payload, d))
+        from_json(Payload, s)
+
+def _throughput(n_threads: int, n: int) -> float:
+    barrier = threading.Barrier(n_threads + 1)
+    threads = [threading.Thread(target=_work, args=(n, barrier)) for _ in range(n_threads)]
+    for t in threads:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in threads:
+        t.join()
+    return n_threads * n / (time.perf_counter() - start)
+
+def bench(args: BenchArgs):
+    gil_enabled = sys._is_gil_enabled() if hasattr(sys, "_is_gil_enabled") else True
+    print(f"python {sys.version.split()[0]}, GIL enabled: {gil_enabled}")
+    _throughput(1, args.n // 10)  # warm up the per-class caches
+
+    base = None
+    n_threads = 1
+    while n_threads <= args.max_threads:
+        ops = _throughput(n_threads, args.n)
+        base = base or ops
+        print(f"threads={n_threads:<3d} ops/s={ops:12.0f} speedup={ops / base:5.2f}x")
+        n_threads *= 2
+
+if __name__ == "__main__":
+    cli(bench)
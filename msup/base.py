@@ -1,9 +1,10 @@
 import os
 import json
 import inspect
+import weakref
 import importlib
 from dataclasses import dataclass, asdict, is_dataclass, fields, MISSING, field
-from collections.abc import Callable as Callable2
+from collections.abc import Callable as Callable2, Iterable
 from types import UnionType
 from typing import Optional, List, Tuple, Dict, Union, TypeVar, get_origin, get_args, Callable, get_type_hints, Any
 
@@ -11,7 +12,11 @@ T = TypeVar('T')
 
 def to_kwargs(clazz: type, x: T) -> dict: ...
 def from_dict(clazz: type, x: dict) -> T: ...
-def to_dict(x: T) -> dict: ...
+def to_dict(x: T, sparse: bool = False) -> dict: ...
+def to_delta(x: T, base: T) -> dict: ...
+def apply_delta(base: T, delta: dict) -> T: ...
+def validate(clazz: type, x: dict) -> list["FieldError"]: ...
+def validate_many(clazz: type, xs: Iterable[dict]) -> list[list["FieldError"]]: ...
 def from_json(clazz: type, s: str | None = None, file_like=None, path: str | None = None) -> T:
     if path:
         assert os.path.exists(path), f"{path} does not exist"
@@ -28,22 +33,47 @@ class InitArg:
     default: Any = MISSING
     type: Any = None
 
-def to_json(x: T, file_like=None, indent: int | None = 2) -> str | None:
+@dataclass
+class FieldError:
+    path: str
+    msg: str
+
+def to_json(x: T, file_like=None, indent: int | None = 2, sparse: bool = False) -> str | None:
     if file_like:
         if isinstance(file_like, str):
             assert file_like.endswith(".json"), f"file should end with json, got: {file_like}"
             os.makedirs(os.path.dirname(file_like), exist_ok=True)
             with open(file_like, "w") as out_f:
-                json.dump(to_dict(x), out_f, indent=indent)
+                json.dump(to_dict(x, sparse=sparse), out_f, indent=indent)
         else:
-            json.dump(to_dict(x), file_like, indent=indent)
+            json.dump(to_dict(x, sparse=sparse), file_like, indent=indent)
     else:
-        return json.dumps(to_dict(x), indent=indent)
+        return json.dumps(to_dict(x, sparse=sparse), indent=indent)
 
 def has_default_value(f):
-    return f.default is not MISSING or f.default_factory is not MISSING
+    return f.default is not MISSING or getattr(f, "default_factory", MISSING) is not MISSING
+
+# NOTE: per-class metadata caches are read without a lock. On a miss the value is computed outside of any lock and
+# published with setdefault, so concurrent callers agree on one value. This relies on the GIL (only GIL builds are
+# tested, see tests/test_threads.py); WeakKeyDictionary makes no atomicity guarantees on free-threaded builds.
+# Classes are held weakly, i.e. classes created at runtime can still be garbage collected. Resolved callables are
+# cached permanently, call clear_caches() after reloading or rebinding a module.
+_fields: weakref.WeakKeyDictionary[type, list] = weakref.WeakKeyDictionary()
+_defaults: weakref.WeakKeyDictionary[type, dict] = weakref.WeakKeyDictionary()
+_callables: dict[str, Any] = {}
+
+def clear_caches():
+    _fields.clear()
+    _defaults.clear()
+    _callables.clear()
 
 def fields_or_init_kwargs(clazz: type):
+    result = _fields.get(clazz)
+    if result is None:
+        result = _fields.setdefault(clazz, _fields_or_init_kwargs(clazz))
+    return result
+
+def _fields_or_init_kwargs(clazz: type):
     assert inspect.isclass(clazz), f"{clazz} is not a class"
     if is_dataclass(clazz):
         return list(fields(clazz))
@@ -60,7 +90,31 @@ def fields_or_init_kwargs(clazz: type):
             result.append(InitArg(name=name, type=type_hints.get(name), default=default))
         return result
 
+def default_values(clazz: type) -> dict:
+    result = _defaults.get(clazz)
+    if result is None:
+        result = {}
+        for f in fields_or_init_kwargs(clazz):
+            if f.default is not MISSING:
+                result[f.name] = f.default
+            elif getattr(f, "default_factory", MISSING) is not MISSING:
+                result[f.name] = f.default_factory()
+        result = _defaults.setdefault(clazz, result)
+    return result
+
+def _equals(x1, x2) -> bool:
+    try:
+        return isinstance(x1, bool) == isinstance(x2, bool) and bool(x1 == x2)
+    except Exception:
+        return False
+
 def load_callable(name: str):
+    result = _callables.get(name)
+    if result is None:
+        result = _callables.setdefault(name, _load_callable(name))
+    return result
+
+def _load_callable(name: str):
     idx = name.rfind('.')
     assert idx != -1, "expected <module_name>.<name>"
     module_name = name[0:idx]
@@ -71,22 +125,22 @@ def load_callable(name: str):
 def maybe_idx(xs: list, idx: int, default: any = None) -> int:
     return xs[idx] if idx < len(xs) else default
 
-def _to_dict_value(x: T, field_type: type):
+def _to_dict_value(x: T, field_type: type, sparse: bool = False):
     t = type(x)
     if is_optional(field_type):
         if x is None:
             return x
-        return _to_dict_value(x, get_args(field_type)[0])
+        return _to_dict_value(x, get_args(field_type)[0], sparse=sparse)
     elif t in (dict,):
         return {
-            _to_dict_value(k, maybe_idx(get_args(field_type), 0, type(k))): 
-            _to_dict_value(v, maybe_idx(get_args(field_type), 1, type(v)))
+            _to_dict_value(k, maybe_idx(get_args(field_type), 0, type(k)), sparse=sparse): 
+            _to_dict_value(v, maybe_idx(get_args(field_type), 1, type(v)), sparse=sparse)
             for k, v in x.items()
         }
     elif t in (tuple, Tuple, list, List):
-        return t([_to_dict_value(xx, maybe_idx(get_args(field_type), 0, type(xx))) for xx in x])
+        return t([_to_dict_value(xx, maybe_idx(get_args(field_type), 0, type(xx)), sparse=sparse) for xx in x])
     elif is_dataclass(t):
-        return to_dict(x)
+        return to_dict(x, sparse=sparse)
     elif get_origin(field_type) is Callable2:
         if callable(x):
             return x.__name__
@@ -97,7 +151,7 @@ def _to_dict_value(x: T, field_type: type):
         result = []
         for arg in get_args(field_type):
             try:
-                result.append(_to_dict_value(x, arg))
+                result.append(_to_dict_value(x, arg, sparse=sparse))
             except Exception:
                 continue
         if len(result) > 0:
@@ -108,15 +162,53 @@ def _to_dict_value(x: T, field_type: type):
     else:
         return x
 
-def to_dict(x: T) -> dict:
+def to_dict(x: T, sparse: bool = False) -> dict:
+    # NOTE: sparse omits fields equal to their default (or default_factory) value
+    defaults = default_values(type(x)) if sparse else {}
     result = {}
     for f in fields_or_init_kwargs(type(x)):
         if hasattr(x, f.name):
             value = getattr(x, f.name)
+            if f.name in defaults and _equals(value, defaults[f.name]):
+                continue
+            field_type = f.type if f.type is not None else type(value)
+            result[f.name] = _to_dict_value(value, field_type, sparse=sparse)
+    return result
+
+def to_delta(x: T, base: T) -> dict:
+    assert type(x) is type(base), f"{type(x)} != {type(base)}"
+    result = {}
+    for f in fields_or_init_kwargs(type(x)):
+        # NOTE: init=False fields are set by the class itself, apply_delta cannot pass them
+        if not getattr(f, "init", True) or not hasattr(x, f.name):
+            continue
+        value = getattr(x, f.name)
+        base_value = getattr(base, f.name, MISSING)
+        if _equals(value, base_value):
+            continue
+        if is_dataclass(value) and type(value) is type(base_value):
+            result[f.name] = to_delta(value, base_value)
+        else:
             field_type = f.type if f.type is not None else type(value)
             result[f.name] = _to_dict_value(value, field_type)
     return result
 
+def apply_delta(base: T, delta: dict) -> T:
+    clazz = type(base)
+    init_fields = [f for f in fields_or_init_kwargs(clazz) if getattr(f, "init", True)]
+    construct_args = {f.name: getattr(base, f.name) for f in init_fields if hasattr(base, f.name)}
+    for f in init_fields:
+        if f.name not in delta:
+            continue
+        value = delta[f.name]
+        base_value = construct_args.get(f.name)
+        if is_dataclass(base_value) and isinstance(value, dict):
+            construct_args[f.name] = apply_delta(base_value, value)
+        else:
+            field_type = f.type if f.type is not None else type(value)
+            construct_args[f.name] = _from_value(value, field_type, type(value), field_name=f.name)
+    return clazz(**construct_args)
+
 def to_kwargs(clazz: type, x: T) -> dict:
     result = {}
     for f in fields_or_init_kwargs(clazz):
@@ -249,6 +341,102 @@ def from_dict(clazz: type, x: dict) -> T:
                 type(x[f.name]),
                 field_name=f.name,
             )
-        elif f.type is not None and is_optional(f.type):
+        elif f.type is not None and is_optional(f.type) and not has_default_value(f):
             construct_args[f.name] = None
     return clazz(**construct_args)
+
+def _validate_fields(clazz: type, x: Any, path: str, errors: list[FieldError]):
+    if not isinstance(x, dict):
+        errors.append(FieldError(path, f"expected a dict for {clazz.__name__}, got {type(x).__name__}"))
+        return
+    for f in fields_or_init_kwargs(clazz):
+        field_path = path + "." + f.name if path else f.name
+        if f.name in x:
+            if f.type is not None:
+                _validate_value(x[f.name], f.type, field_path, errors)
+        elif not has_default_value(f) and not (f.type is not None and is_optional(f.type)):
+            errors.append(FieldError(field_path, "missing required field"))
+
+def _validate_inline_json(x: str, path: str, errors: list[FieldError]) -> dict | None:
+    # NOTE: unlike dict_from_str, never read from the filesystem: payloads may be untrusted
+    if not x.startswith("{"):
+        errors.append(FieldError(path, "expected an inline JSON object, paths are not read during validation"))
+        return None
+    try:
+        return json.loads(x)
+    except ValueError as e:
+        errors.append(FieldError(path, f"invalid JSON: {e}"))
+        return None
+
+def _validate_value(x: Any, field_type: type, path: str, errors: list[FieldError]):
+    origin = get_origin(field_type) or field_type
+    args = get_args(field_type)
+
+    if is_dataclass(field_type):
+        if isinstance(x, field_type):
+            return
+        if isinstance(x, str):
+            x = _validate_inline_json(x, path, errors)
+            if x is None:
+                return
+        _validate_fields(field_type, x, path, errors)
+    elif is_optional(field_type):
+        if x is not None:
+            _validate_value(x, [a for a in args if a is not type(None)][0], path, errors)
+    elif origin in (Union, UnionType):
+        for arg in args:
+            arg_errors = []
+            _validate_value(x, arg, path, arg_errors)
+            if len(arg_errors) == 0:
+                return
+        errors.append(FieldError(path, f"{type(x).__name__} does not match any of {field_type}"))
+    elif origin in (int, float, str, bool):
+        if not isinstance(x, (int, float, str, bool)):
+            errors.append(FieldError(path, f"expected {origin.__name__}, got {type(x).__name__}"))
+            return
+        try:
+            origin(x)
+        except (ValueError, OverflowError, TypeError):
+            errors.append(FieldError(path, f"cannot convert {x!r} to {origin.__name__}"))
+    elif origin in (dict,):
+        if isinstance(x, str):
+            x = _validate_inline_json(x, path, errors)
+            if x is None:
+                return
+        if not isinstance(x, dict):
+            errors.append(FieldError(path, f"expected dict, got {type(x).__name__}"))
+            return
+        for k, v in x.items():
+            if len(args) == 2:
+                _validate_value(k, args[0], f"{path}.key", errors)
+                _validate_value(v, args[1], f"{path}.{k}", errors)
+    elif origin in (tuple, Tuple, list, List):
+        # NOTE: as in _is_compat, a list is not accepted for a tuple (and vice versa)
+        if not isinstance(x, origin):
+            errors.append(FieldError(path, f"expected {origin.__name__}, got {type(x).__name__}"))
+            return
+        if origin is tuple and args and not (len(args) == 2 and args[1] is Ellipsis):
+            if len(args) != len(x):
+                errors.append(FieldError(path, f"expected {len(args)} items, got {len(x)}"))
+                return
+            item_types = args
+        else:
+            item_types = [args[0]] * len(x) if args else []
+        for i, (xx, item_type) in enumerate(zip(x, item_types)):
+            _validate_value(xx, item_type, f"{path}[{i}]", errors)
+    elif origin is Callable2:
+        # NOTE: callables given as a string are not imported
+        if not (callable(x) or (isinstance(x, str) and "." in x)):
+            errors.append(FieldError(path, f"expected a callable or '<module_name>.<name>', got {x!r}"))
+    elif origin is Any:
+        return
+    elif inspect.isclass(origin) and not isinstance(x, origin):
+        errors.append(FieldError(path, f"expected {origin.__name__}, got {type(x).__name__}"))
+
+def validate(clazz: type, x: dict) -> list[FieldError]:
+    errors = []
+    _validate_fields(clazz, x, "", errors)
+    return errors
+
+def validate_many(clazz: type, xs: Iterable[dict]) -> list[list[FieldError]]:
+    return [validate(clazz, x) for x in xs]
@@ -10,7 +10,7 @@ from typing import Optional, List, Dict, Union, TypeVar, get_origin, get_args, C
 
 T = TypeVar('T')
 
-def cli(cmd_or_cmds: Callable[[T], Any] | dict[Callable[[T], Any], str], **argsparse_kwargs): ...
+def cli(cmd_or_cmds: Callable[[T], Any] | dict[Callable[[T], Any], str], pos_arg_config: bool = False, serve: str | None = None, preload: list[str] | None = None, **argsparse_kwargs): ...
 def cliarg(help: str = "", short: str | list[str] | None = None, env: str | None = None, pos: bool = False, opt: bool = True, **kwargs): ...
 
 def strtobool(value: str) -> bool:
@@ -127,7 +127,7 @@ def _get_cli_arg_type(x: type) -> type:
 def to_bool(s: str) -> bool:
     return bool(strtobool(s))
 
-def _add_args(parser, cmd_type: type, prefix: str = "", short_prefix: str | None = None, pos_arg_config: bool = False, force_no_default: bool = False):
+def _add_args(parser, cmd_type: type, prefix: str = "", short_prefix: str | None = None, pos_arg_config: bool = False, force_no_default: bool = False, env_defaults: list | None = None):
     assert is_dataclass(cmd_type), f"{cmd_type} is not a dataclass"
     if prefix == "":
         if pos_arg_config:
@@ -155,6 +155,9 @@ def _add_args(parser, cmd_type: type, prefix: str = "", short_prefix: str | None
         default_help = f"Default: {default_value}" if default_value else ""
         env_name = f.metadata.get("env")
         env_value = os.getenv(env_name) if env_name else None
+        if env_name and env_defaults is not None and not is_dataclass(f.type):
+            # NOTE: re-resolved on every run, see _resolve_env_defaults
+            env_defaults.append((parser, name, env_name, f.type, field_name, default_value))
         if env_value:
             default_value = _from_value(env_value, f.type, str, field_name)
             default_help = f"Default (using env: ${{{env_name}}}): {default_value}"
@@ -193,6 +196,7 @@ def _add_args(parser, cmd_type: type, prefix: str = "", short_prefix: str | None
                     prefix=field_name,
                     short_prefix=f.metadata.get("short", [None])[0],
                     force_no_default=True,
+                    env_defaults=env_defaults,
                 )
             elif get_origin(f.type) in (list,):
                 kwargs["nargs"] = "*"
@@ -242,8 +246,9 @@ def _add_args(parser, cmd_type: type, prefix: str = "", short_prefix: str | None
 def cliarg(help: str = "", short: str | list[str] | None = None, env: str | None = None, pos: bool = False, opt: bool = True, **kwargs):
     return field(metadata={"help": help, "short": short if isinstance(short, list) else [short], "env": env, "pos": pos, "opt": opt}, **kwargs)
 
-def cli(cmd_or_cmds: Callable[[T], Any] | dict[Callable[[T], Any], str], pos_arg_config: bool = False, **argsparse_kwargs):
+def _make_parser(cmd_or_cmds: Callable[[T], Any] | dict[Callable[[T], Any], str], pos_arg_config: bool = False, **argsparse_kwargs):
     parser = argparse.ArgumentParser(**argsparse_kwargs)
+    env_defaults = []
     if isinstance(cmd_or_cmds, dict):
         seen = set()
 
@@ -259,18 +264,45 @@ def cli(cmd_or_cmds: Callable[[T], Any] | dict[Callable[[T], Any], str], pos_arg
                 cmd_name,
                 help=desc,
             )
-            p.set_defaults(func=cmd_fn, cmd_type=cmd_type)
-            _add_args(p, cmd_type, pos_arg_config=pos_arg_config)
-
-        args = parser.parse_args()
-        if hasattr(args, 'func'):
-            args.func(_from_cli_args(args.cmd_type, args))
-        else:
-            parser.print_help()
+            p.set_defaults(_msup_func=cmd_fn, _msup_cmd_type=cmd_type)
+            _add_args(p, cmd_type, pos_arg_config=pos_arg_config, env_defaults=env_defaults)
+    else:
+        cmd_type = _get_first_arg(cmd_or_cmds)
+        parser.set_defaults(_msup_func=cmd_or_cmds, _msup_cmd_type=cmd_type)
+        _add_args(parser, cmd_type, pos_arg_config=pos_arg_config, env_defaults=env_defaults)
+    return parser, env_defaults
+
+def _resolve_env_defaults(env_defaults: list):
+    # NOTE: the parser may be built once and run many times (see serve), so env backed defaults use the current env
+    for parser, dest, env_name, field_type, field_name, default_value in env_defaults:
+        env_value = os.getenv(env_name)
+        if env_value:
+            default_value = _from_value(env_value, field_type, str, field_name)
+        parser.set_defaults(**{dest: default_value})
+
+def _run(parser, env_defaults: list, argv: list[str] | None = None):
+    _resolve_env_defaults(env_defaults)
+    args = parser.parse_args(argv)
+    # NOTE: reserved names, so they do not collide with dataclass fields
+    if hasattr(args, '_msup_func'):
+        args._msup_func(_from_cli_args(args._msup_cmd_type, args))
+    else:
+        parser.print_help()
+
+def cli(
+    cmd_or_cmds: Callable[[T], Any] | dict[Callable[[T], Any], str],
+    pos_arg_config: bool = False,
+    serve: str | None = None,
+    preload: list[str] | None = None,
+    **argsparse_kwargs,
+):
+    parser, env_defaults = _make_parser(cmd_or_cmds, pos_arg_config=pos_arg_config, **argsparse_kwargs)
+    # NOTE: opt-in warm daemon, argv vectors are received over a unix socket (see msup/serve.py)
+    if serve:
+        from msup.serve import serve_forever
+        serve_forever(lambda argv: _run(parser, env_defaults, argv), serve, preload=preload)
     else:
-        _add_args(parser, _get_first_arg(cmd_or_cmds), pos_arg_config=pos_arg_config)
-        args = parser.parse_args()
-        cmd_or_cmds(_from_cli_args(_get_first_arg(cmd_or_cmds), args))
+        _run(parser, env_defaults)
 
 
 def ex_default_callable(x: int):
@@ -0,0 +1,223 @@
+import mmap
+import struct
+import weakref
+from dataclasses import dataclass, is_dataclass, fields, field
+from typing import TypeVar, get_args
+
+from msup.base import is_optional
+
+T = TypeVar('T')
+
+def pack(x: T) -> bytes: ...
+def unpack(clazz: type, buf: bytes) -> T: ...
+def pack_many(xs: list[T], clazz: type | None = None) -> bytes: ...
+def unpack_many(clazz: type, buf: bytes) -> list[T]: ...
+def write_records(path: str, xs: list[T], clazz: type | None = None): ...
+
+MAGIC = b"MSR1"
+# magic, record size, number of records
+HEADER = struct.Struct("<4sIQ")
+
+_CODES = {int: "q", float: "d", bool: "?"}
+
+def recfield(width: int | None = None, **kwargs):
+    return field(metadata={"width": width}, **kwargs)
+
+@dataclass
+class RecordLayout:
+    struct: struct.Struct
+    names: list[str]
+    kinds: list[str]  # num | str (fixed width) | var (offset + length into the heap)
+    widths: list[int | None]
+    optional: list[bool]
+    n_bitmap_bytes: int
+    simple: bool  # only non-optional numeric fields, i.e. unpacked values can be passed as keyword arguments as is
+
+# NOTE: see msup/base.py, classes are held weakly and a layout must not reference its class
+_layouts: weakref.WeakKeyDictionary[type, RecordLayout] = weakref.WeakKeyDictionary()
+
+def _make_layout(clazz: type) -> RecordLayout:
+    assert is_dataclass(clazz), f"{clazz} is not a dataclass"
+    names, kinds, widths, optional, codes = [], [], [], [], []
+    for f in fields(clazz):
+        # NOTE: init=False fields are set by the class itself (default or __post_init__)
+        if not f.init:
+            continue
+        field_type = f.type
+        opt = is_optional(field_type)
+        if opt:
+            field_type = [a for a in get_args(field_type) if a is not type(None)][0]
+
+        width = None
+        if field_type in _CODES:
+            kinds.append("num")
+            codes.append(_CODES[field_type])
+        elif field_type is str and f.metadata.get("width"):
+            width = f.metadata["width"]
+            kinds.append("str")
+            codes.append(f"{width}s")
+        elif field_type is str:
+            kinds.append("var")
+            codes.append("II")
+        else:
+            raise TypeError(f"{clazz.__name__}.{f.name}: {f.type} is not supported by the record format")
+        names.append(f.name)
+        widths.append(width)
+        optional.append(opt)
+
+    n_bitmap_bytes = (sum(optional) + 7) // 8
+    bitmap_code = f"{n_bitmap_bytes}s" if n_bitmap_bytes else ""
+    return RecordLayout(
+        struct=struct.Struct("<" + bitmap_code + "".join(codes)),
+        names=names,
+        kinds=kinds,
+        widths=widths,
+        optional=optional,
+        n_bitmap_bytes=n_bitmap_bytes,
+        simple=n_bitmap_bytes == 0 and all(k == "num" for k in kinds),
+    )
+
+def record_layout(clazz: type) -> RecordLayout:
+    layout = _layouts.get(clazz)
+    if layout is None:
+        layout = _layouts.setdefault(clazz, _make_layout(clazz))
+    return layout
+
+def _pack_into(layout: RecordLayout, x: T, out: bytearray, heap: bytearray):
+    if layout.simple:
+        out += layout.struct.pack(*[getattr(x, name) for name in layout.names])
+        return
+
+    values = []
+    bitmap = 0
+    opt_idx = 0
+    for name, kind, width, opt in zip(layout.names, layout.kinds, layout.widths, layout.optional):
+        v = getattr(x, name)
+        if opt:
+            if v is None:
+                bitmap |= 1 << opt_idx
+            opt_idx += 1
+
+        if kind == "num":
+            values.append(0 if v is None else v)
+            continue
+
+        data = b"" if v is None else v.encode()
+        if kind == "str":
+            if len(data) > width:
+                raise ValueError(f"{name}: {v!r} is longer than {width} bytes")
+            values.append(data)
+        else:
+            values.extend((len(heap), len(data)))
+            heap += data
+
+    if layout.n_bitmap_bytes:
+        values.insert(0, bitmap.to_bytes(layout.n_bitmap_bytes, "little"))
+    out += layout.struct.pack(*values)
+
+def _from_values(clazz: type, layout: RecordLayout, values: tuple, heap) -> T:
+    if layout.simple:
+        return clazz(**dict(zip(layout.names, values)))
+
+    i = 0
+    bitmap = 0
+    if layout.n_bitmap_bytes:
+        bitmap = int.from_bytes(values[0], "little")
+        i = 1
+
+    kwargs = {}
+    opt_idx = 0
+    for name, kind, opt in zip(layout.names, layout.kinds, layout.optional):
+        is_none = False
+        if opt:
+            is_none = bitmap & (1 << opt_idx)
+            opt_idx += 1
+
+        if kind == "var":
+            offset, length = values[i], values[i + 1]
+            i += 2
+            v = str(heap[offset:offset + length], "utf-8")
+        elif kind == "str":
+            v = values[i].rstrip(b"\0").decode()
+            i += 1
+        else:
+            v = values[i]
+            i += 1
+        kwargs[name] = None if is_none else v
+    return clazz(**kwargs)
+
+def pack(x: T) -> bytes:
+    layout = record_layout(type(x))
+    out, heap = bytearray(), bytearray()
+    _pack_into(layout, x, out, heap)
+    return bytes(out + heap)
+
+def unpack(clazz: type, buf: bytes) -> T:
+    layout = record_layout(clazz)
+    buf = memoryview(buf)
+    return _from_values(clazz, layout, layout.struct.unpack_from(buf, 0), buf[layout.struct.size:])
+
+# NOTE: format: header, n fixed size records, heap (variable length strings)
+def pack_many(xs: list[T], clazz: type | None = None) -> bytes:
+    clazz = clazz or (type(xs[0]) if xs else None)
+    assert clazz is not None, "clazz must be provided for an empty list"
+    layout = record_layout(clazz)
+    out, heap = bytearray(HEADER.pack(MAGIC, layout.struct.size, len(xs))), bytearray()
+    for x in xs:
+        _pack_into(layout, x, out, heap)
+    return bytes(out + heap)
+
+def _read_header(clazz: type, layout: RecordLayout, buf) -> int:
+    magic, size, n = HEADER.unpack_from(buf, 0)
+    assert magic == MAGIC, f"not a record buffer (magic={magic})"
+    assert size == layout.struct.size, f"record size mismatch for {clazz.__name__}: {size} != {layout.struct.size}"
+    return n
+
+def unpack_many(clazz: type, buf: bytes) -> list[T]:
+    layout = record_layout(clazz)
+    buf = memoryview(buf)
+    n = _read_header(clazz, layout, buf)
+    heap_start = HEADER.size + n * layout.struct.size
+    heap = buf[heap_start:]
+    return [_from_values(clazz, layout, v, heap) for v in layout.struct.iter_unpack(buf[HEADER.size:heap_start])]
+
+def write_records(path: str, xs: list[T], clazz: type | None = None):
+    with open(path, "wb") as out_f:
+        out_f.write(pack_many(xs, clazz))
+
+class RecordFile:
+    def __init__(self, clazz: type, path: str):
+        self.clazz = clazz
+        self.layout = record_layout(clazz)
+        self.path = path
+        with open(path, "rb") as in_f:
+            self.mm = mmap.mmap(in_f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.buf = memoryview(self.mm)
+        self.n = _read_header(clazz, self.layout, self.buf)
+        self.heap = self.buf[HEADER.size + self.n * self.layout.struct.size:]
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __getitem__(self, i: int) -> T:
+        if i < 0:
+            i += self.n
+        if not 0 <= i < self.n:
+            raise IndexError(f"index {i} out of range for {self.path} with {self.n} records")
+        values = self.layout.struct.unpack_from(self.buf, HEADER.size + i * self.layout.struct.size)
+        return _from_values(self.clazz, self.layout, values, self.heap)
+
+    def __iter__(self):
+        for i in range(self.n):
+            yield self[i]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.heap.release()
+        self.buf.release()
+        self.mm.close()
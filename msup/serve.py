@@ -0,0 +1,231 @@
+import io
+import os
+import sys
+import json
+import stat
+import signal
+import select
+import socket
+import struct
+import importlib
+import traceback
+from typing import Callable, Any
+
+# protocol: frames of (kind, length, payload). The client sends a REQUEST frame ({"argv", "cwd", "env"}), optionally
+# followed by SIGNAL frames (a forwarded SIGINT/SIGTERM), the server streams back STDOUT/STDERR frames followed by an
+# EXIT frame. Closing the connection cancels the command.
+REQUEST, STDOUT, STDERR, EXIT, SIGNAL = 0, 1, 2, 3, 4
+FRAME = struct.Struct("<BI")
+# seconds between SIGTERM and SIGKILL when the client goes away
+KILL_TIMEOUT = 1.0
+
+def _send_frame(conn: socket.socket, kind: int, data: bytes):
+    conn.sendall(FRAME.pack(kind, len(data)) + data)
+
+def _recv_exact(conn: socket.socket, n: int) -> bytes:
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = conn.recv(n - len(buf))
+        if not chunk:
+            raise ConnectionError("connection closed before the command finished")
+        buf += chunk
+    return bytes(buf)
+
+def _recv_frame(conn: socket.socket) -> tuple[int, bytes]:
+    kind, length = FRAME.unpack(_recv_exact(conn, FRAME.size))
+    return kind, _recv_exact(conn, length)
+
+class _FrameStream(io.TextIOBase):
+    def __init__(self, conn: socket.socket, kind: int):
+        self.conn = conn
+        self.kind = kind
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, s: str) -> int:
+        if s:
+            _send_frame(self.conn, self.kind, s.encode())
+        return len(s)
+
+def _exit_code(e: SystemExit) -> int:
+    if e.code is None:
+        return 0
+    elif isinstance(e.code, int):
+        return e.code
+    print(e.code, file=sys.stderr)
+    return 1
+
+def _run_request(conn: socket.socket, req: dict, run: Callable[[list[str]], Any]) -> int:
+    os.chdir(req["cwd"])
+    os.environ.clear()
+    os.environ.update(req["env"])
+    sys.argv = sys.argv[:1] + req["argv"]
+    sys.stdin = open(os.devnull)
+    sys.stdout = _FrameStream(conn, STDOUT)
+    sys.stderr = _FrameStream(conn, STDERR)
+
+    code = 0
+    try:
+        run(req["argv"])
+    except SystemExit as e:
+        code = _exit_code(e)
+    except KeyboardInterrupt:
+        code = 128 + signal.SIGINT
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+    return code
+
+def _killpg(pgid: int, signum: int):
+    try:
+        os.killpg(pgid, signum)
+    except ProcessLookupError:
+        pass
+
+def _handle(conn: socket.socket, run: Callable[[list[str]], Any]) -> int:
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+    kind, data = _recv_frame(conn)
+    assert kind == REQUEST, f"expected a request frame, got: {kind}"
+    req = json.loads(data)
+
+    # NOTE: the command runs in a worker with its own process group, so it (and anything it spawns) can be signalled
+    # or killed while this process watches the connection. The write end of `done` is closed when the worker exits.
+    done_r, done_w = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        code = 1
+        try:
+            os.setpgid(0, 0)
+            os.close(done_r)
+            code = _run_request(conn, req, run)
+        finally:
+            os._exit(code)
+    os.close(done_w)
+    try:
+        os.setpgid(pid, pid)
+    except OSError:
+        pass
+
+    poller = select.poll()
+    poller.register(conn, select.POLLIN)
+    poller.register(done_r, select.POLLIN)
+    client_gone = False
+    while not client_gone:
+        events = dict(poller.poll())
+        if done_r in events:
+            break
+        try:
+            kind, data = _recv_frame(conn)
+        except OSError:
+            client_gone = True
+            continue
+        if kind == SIGNAL:
+            _killpg(pid, struct.unpack("<i", data)[0])
+
+    if client_gone:
+        _killpg(pid, signal.SIGTERM)
+        if not select.select([done_r], [], [], KILL_TIMEOUT)[0]:
+            _killpg(pid, signal.SIGKILL)
+    os.close(done_r)
+
+    _, status = os.waitpid(pid, 0)
+    code = os.waitstatus_to_exitcode(status)
+    if code < 0:
+        code = 128 - code
+    if not client_gone:
+        try:
+            _send_frame(conn, EXIT, struct.pack("<i", code))
+        except OSError:
+            pass
+    conn.close()
+    return code
+
+def _remove_stale_socket(path: str):
+    if not os.path.exists(path):
+        return
+    if not stat.S_ISSOCK(os.stat(path).st_mode):
+        raise FileExistsError(f"{path} exists and is not a socket")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(path)
+        except ConnectionRefusedError:
+            # NOTE: nothing is listening, i.e. left over from a server that did not shut down cleanly
+            os.unlink(path)
+            return
+    raise FileExistsError(f"{path} is in use by another running server")
+
+def serve_forever(run: Callable[[list[str]], Any], path: str, preload: list[str] | None = None):
+    for name in preload or []:
+        importlib.import_module(name)
+
+    _remove_stale_socket(path)
+    # NOTE: each request is run in a forked child, children are reaped automatically
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        server.bind(path)
+        server.listen()
+        inode = os.stat(path).st_ino
+        print(f"[msup] serving on {path} (pid={os.getpid()})", file=sys.stderr)
+        try:
+            while True:
+                conn, _ = server.accept()
+                if os.fork() == 0:
+                    server.close()
+                    code = 1
+                    try:
+                        code = _handle(conn, run)
+                    finally:
+                        os._exit(code)
+                conn.close()
+        finally:
+            # NOTE: only remove the socket if it is still ours
+            if os.path.exists(path) and os.stat(path).st_ino == inode:
+                os.unlink(path)
+
+class _Interrupted(Exception):
+    def __init__(self, signum: int):
+        self.signum = signum
+
+def _interrupt(signum, frame):
+    raise _Interrupted(signum)
+
+def client(path: str, argv: list[str]) -> int:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.connect(path)
+        req = {"argv": argv, "cwd": os.getcwd(), "env": dict(os.environ)}
+        _send_frame(conn, REQUEST, json.dumps(req).encode())
+        handlers = {s: signal.signal(s, _interrupt) for s in (signal.SIGINT, signal.SIGTERM)}
+        try:
+            while True:
+                kind, data = _recv_frame(conn)
+                if kind == STDOUT:
+                    sys.stdout.buffer.write(data)
+                    sys.stdout.flush()
+                elif kind == STDERR:
+                    sys.stderr.buffer.write(data)
+                    sys.stderr.flush()
+                elif kind == EXIT:
+                    return struct.unpack("<i", data)[0]
+        except _Interrupted as e:
+            # NOTE: forward the signal, closing the connection afterwards cancels the command if it is still running
+            try:
+                _send_frame(conn, SIGNAL, struct.pack("<i", e.signum))
+            except OSError:
+                pass
+            return 128 + e.signum
+        finally:
+            for s, handler in handlers.items():
+                signal.signal(s, handler)
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("usage: python -m msup.serve <socket_path> [args...]", file=sys.stderr)
+        sys.exit(2)
+    try:
+        sys.exit(client(sys.argv[1], sys.argv[2:]))
+    except (ConnectionError, FileNotFoundError) as e:
+        print(f"[ERROR]: {e}", file=sys.stderr)
+        sys.exit(1)
+    except KeyboardInterrupt:
+        sys.exit(128 + signal.SIGINT)
@@ -0,0 +1,206 @@
+import json
+import struct
+from dataclasses import dataclass, is_dataclass, fields
+from multiprocessing.shared_memory import SharedMemory
+from typing import TypeVar, get_origin, get_args
+
+from msup.base import _to_dict_value, _from_value
+
+T = TypeVar('T')
+
+def to_shm(clazz: type, xs: list[T], name: str | None = None) -> "ShmBatch": ...
+def from_shm(clazz: type, name: str) -> "ShmBatch": ...
+
+_SCALAR_CODES = {int: "q", float: "d", bool: "?"}
+
+@dataclass
+class ShmColumn:
+    name: str
+    kind: str  # scalar | array | str | json
+    code: str = "B"
+    type: type = None
+
+def shm_schema(clazz: type) -> list[ShmColumn]:
+    assert is_dataclass(clazz), f"{clazz} is not a dataclass"
+    result = []
+    for f in fields(clazz):
+        # NOTE: init=False fields are set by the class itself (default or __post_init__)
+        if not f.init:
+            continue
+        args = get_args(f.type)
+        if f.type in _SCALAR_CODES:
+            result.append(ShmColumn(f.name, "scalar", _SCALAR_CODES[f.type], f.type))
+        elif get_origin(f.type) is list and len(args) == 1 and args[0] in (int, float):
+            result.append(ShmColumn(f.name, "array", _SCALAR_CODES[args[0]], f.type))
+        elif f.type is str:
+            result.append(ShmColumn(f.name, "str", "B", f.type))
+        else:
+            result.append(ShmColumn(f.name, "json", "B", f.type))
+    return result
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+def _encode_columns(col: ShmColumn, values: list) -> list[bytes]:
+    if col.kind == "scalar":
+        return [struct.pack(f"{len(values)}{col.code}", *values)]
+
+    if col.kind == "array":
+        chunks = values
+        data = struct.pack(f"{sum(len(v) for v in values)}{col.code}", *(x for v in values for x in v))
+    else:
+        if col.kind == "str":
+            chunks = [v.encode() for v in values]
+        else:
+            chunks = [json.dumps(_to_dict_value(v, col.type)).encode() for v in values]
+        data = b"".join(chunks)
+
+    offsets = [0]
+    for c in chunks:
+        offsets.append(offsets[-1] + len(c))
+    return [struct.pack(f"{len(offsets)}q", *offsets), data]
+
+# NOTE: fields are stored column-wise: int/float/bool as contiguous arrays, list[int]/list[float] as
+# offsets + values (read back as memoryviews, no copy), str as offsets + utf-8 and anything else as JSON.
+# `batch[i]` copies list fields, whereas views returned by `get`/`column` are zero-copy and are owned by the caller:
+# they must be released before calling `close` (otherwise `close` raises a BufferError and the batch stays open).
+class ShmBatch:
+    def __init__(self, clazz: type, shm: SharedMemory):
+        self.clazz = clazz
+        self.shm = shm
+        self.schema = shm_schema(clazz)
+        self._detached = []
+        self._open_views()
+
+    def _open_views(self):
+        shm = self.shm
+        n_cols = sum(1 if c.kind == "scalar" else 2 for c in self.schema)
+        header = struct.Struct(f"{1 + 2 * n_cols}q")
+        n, *table = header.unpack_from(shm.buf, 0)
+        self.n = n
+
+        self._views = []
+        self._columns = {}
+        i = 0
+        for col in self.schema:
+            views = []
+            for code in ((col.code,) if col.kind == "scalar" else ("q", col.code)):
+                offset, nbytes = table[i], table[i + 1]
+                views.append(shm.buf[offset:offset + nbytes].cast(code))
+                i += 2
+            self._views.extend(views)
+            self._columns[col.name] = (col, views)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __getitem__(self, i: int) -> T:
+        kwargs = {}
+        for col in self.schema:
+            v = self.get(i, col.name)
+            if col.kind == "array":
+                kwargs[col.name] = v.tolist()
+                v.release()
+            else:
+                kwargs[col.name] = v
+        return self.clazz(**kwargs)
+
+    def __reduce__(self):
+        return (from_shm, (self.clazz, self.name))
+
+    def column(self, name: str) -> memoryview:
+        col, views = self._columns[name]
+        assert col.kind == "scalar", f"{name} is not a scalar column ({col.type})"
+        return views[0][:]
+
+    def get(self, i: int, name: str):
+        if i < 0:
+            i += self.n
+        if not 0 <= i < self.n:
+            raise IndexError(f"index {i} out of range for batch of size {self.n}")
+
+        col, views = self._columns[name]
+        if col.kind == "scalar":
+            return views[0][i]
+
+        offsets, data = views
+        start, end = offsets[i], offsets[i + 1]
+        if col.kind == "array":
+            return data[start:end]
+        elif col.kind == "str":
+            return str(data[start:end], "utf-8")
+        else:
+            x = json.loads(str(data[start:end], "utf-8"))
+            return _from_value(x, col.type, type(x), field_name=name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __del__(self):
+        # NOTE: release our views before SharedMemory's finalizer runs, e.g. for a batch unpickled in a worker
+        for v in getattr(self, "_views", []):
+            v.release()
+        self._views = []
+        for shm in [getattr(self, "shm", None)] + getattr(self, "_detached", []):
+            try:
+                if shm is not None:
+                    shm.close()
+            except BufferError:
+                pass
+
+    def close(self):
+        for v in self._views:
+            v.release()
+        try:
+            self.shm.close()
+        except BufferError:
+            # NOTE: views returned by get/column are still alive. SharedMemory.close has already dropped its buffer,
+            # so keep the old handle alive (it is closed once those views are released) and re-attach to stay usable
+            self._detached.append(self.shm)
+            self.shm = _attach(self.shm.name)
+            self._open_views()
+            raise
+        for shm in self._detached:
+            shm.close()
+        self._detached = []
+        self._views = []
+        self._columns = {}
+
+    def unlink(self):
+        self.shm.unlink()
+
+def to_shm(clazz: type, xs: list[T], name: str | None = None) -> ShmBatch:
+    schema = shm_schema(clazz)
+    blobs = []
+    for col in schema:
+        blobs.extend(_encode_columns(col, [getattr(x, col.name) for x in xs]))
+
+    header = struct.Struct(f"{1 + 2 * len(blobs)}q")
+    table = []
+    offset = _align(header.size)
+    for b in blobs:
+        table.extend([offset, len(b)])
+        offset = _align(offset + len(b))
+
+    shm = SharedMemory(name=name, create=True, size=offset)
+    header.pack_into(shm.buf, 0, len(xs), *table)
+    for b, start in zip(blobs, table[::2]):
+        shm.buf[start:start + len(b)] = b
+    return ShmBatch(clazz, shm)
+
+def _attach(name: str) -> SharedMemory:
+    try:
+        # NOTE: python >= 3.13, otherwise the attaching process' resource tracker may unlink the segment
+        return SharedMemory(name=name, track=False)
+    except TypeError:
+        return SharedMemory(name=name)
+
+def from_shm(clazz: type, name: str) -> ShmBatch:
+    return ShmBatch(clazz, _attach(name))
@@ -1,7 +1,9 @@
-from dataclasses import dataclass
+import os
+import tempfile
+from dataclasses import dataclass, field
 from typing import Dict, Union
 
-from msup.base import _is_compat, from_dict, to_dict
+from msup.base import _is_compat, from_dict, to_dict, to_delta, apply_delta, validate, validate_many, FieldError
 
 @dataclass
 class Foo:
@@ -21,6 +23,31 @@ class Foobar:
     z: Dict[int, int] | None = None
     bar: Bar | None = None
 
+@dataclass
+class Opt:
+    lr: float = 0.1
+    betas: list[float] = field(default_factory=lambda: [0.9, 0.999])
+
+@dataclass
+class Pair:
+    t: tuple[int, int]
+    xs: list[int] | None = None
+
+@dataclass
+class D:
+    a: int
+    b: int = field(init=False, default=0)
+
+    def __post_init__(self):
+        self.b = 2 * self.a
+
+@dataclass
+class Run:
+    name: str
+    opt: Opt = field(default_factory=Opt)
+    seed: int | None = 0
+    debug: bool = False
+
 class Baz:
     def __init__(self, name: str, count: int | None = None, meta: Dict[str, int] | None = None):
         self.name = name
@@ -45,3 +72,61 @@ if __name__ == "__main__":
     assert baz.name == "ok"
     assert baz.count is None
     assert baz.meta == {"k": 1}
+
+    r = Run(name="a")
+    assert to_dict(r, sparse=True) == {"name": "a"}
+    assert from_dict(Run, to_dict(r, sparse=True)) == r
+    r2 = Run(name="a", opt=Opt(lr=0.5), seed=None, debug=True)
+    assert to_dict(r2, sparse=True) == {"name": "a", "opt": {"lr": 0.5}, "seed": None, "debug": True}
+    assert from_dict(Run, to_dict(r2, sparse=True)) == r2
+    assert to_dict(Run(name="a", seed=1), sparse=True) == {"name": "a", "seed": 1}
+
+    assert to_delta(r, r) == {}
+    delta = to_delta(r2, r)
+    assert delta == {"opt": {"lr": 0.5}, "seed": None, "debug": True}
+    assert apply_delta(r, delta) == r2
+    assert apply_delta(r, {"opt": {"betas": [0.5, 0.5]}}) == Run(name="a", opt=Opt(betas=[0.5, 0.5]))
+    assert r.opt == Opt()
+    assert to_delta(D(4), D(3)) == {"a": 4}
+    assert apply_delta(D(3), {"a": 4}) == D(4)
+    assert apply_delta(D(3), {"a": 4}).b == 8
+    assert apply_delta(Run(name="a", opt=Opt()), {"name": "b"}) == Run(name="b")
+
+    assert validate(Foobar, to_dict(f)) == []
+    assert validate(Foobar, {"dd": {}, "foo": '{"a": 1, "b": 2}'}) == []
+    assert validate(Baz, {"name": "ok", "count": None, "meta": {"k": 1}}) == []
+    assert validate(Foobar, {"primitive": "abc", "foo": {"a": "x"}, "bar": {"x": [1.0, "y"]}, "z": {"1": [2]}}) == [
+        FieldError("dd", "missing required field"),
+        FieldError("primitive", "cannot convert 'abc' to int"),
+        FieldError("foo.a", "cannot convert 'x' to int"),
+        FieldError("foo.b", "missing required field"),
+        FieldError("z.1", "expected int, got list"),
+        FieldError("bar.x[1]", "cannot convert 'y' to float"),
+    ]
+    assert validate(Run, {"name": "a", "opt": 3}) == [FieldError("opt", "expected a dict for Opt, got int")]
+    assert [len(errors) for errors in validate_many(Foo, [{"a": 1, "b": 2}, {"a": 1}, {}])] == [0, 1, 2]
+    assert validate(Foo, {"a": float("inf"), "b": float("nan")}) == [
+        FieldError("a", "cannot convert inf to int"),
+        FieldError("b", "cannot convert nan to int"),
+    ]
+    assert validate(Pair, {"t": [1, 2], "xs": (1,)}) == [
+        FieldError("t", "expected tuple, got list"),
+        FieldError("xs", "expected list, got tuple"),
+    ]
+    assert validate(Pair, {"t": (1, 2), "xs": [1]}) == []
+    for payload in ({"t": [1, 2]}, {"t": (1, 2), "xs": (1,)}):
+        try:
+            from_dict(Pair, payload)
+            raise RuntimeError("expected AssertionError")
+        except AssertionError:
+            pass
+
+    # strings are only parsed as inline JSON, the filesystem is never read
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.makedirs(os.path.join(tmp_dir, "x.json"))
+        for payload in (os.path.join(tmp_dir, "x.json"), os.path.join(tmp_dir, "missing.json"), "abc"):
+            assert validate(Foobar, {"dd": payload, "foo": payload}) == [
+                FieldError("dd", "expected an inline JSON object, paths are not read during validation"),
+                FieldError("foo", "expected an inline JSON object, paths are not read during validation"),
+            ]
+    assert validate(Foobar, {"dd": "{", "foo": '{"a": 1, "b": 2}'})[0].msg.startswith("invalid JSON")
@@ -0,0 +1,30 @@
+import io
+import sys
+import contextlib
+from dataclasses import dataclass
+
+from msup.cli import cli
+
+@dataclass
+class A:
+    func: str = "x"
+    cmd_type: str = "y"
+
+def main(a: A):
+    print(a)
+
+def other(a: A):
+    print("other", a)
+
+def run(cmd_or_cmds, *argv: str) -> str:
+    sys.argv = ["prog", *argv]
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        cli(cmd_or_cmds)
+    return out.getvalue().strip()
+
+if __name__ == "__main__":
+    # fields may use names that cli() uses internally
+    assert run(main) == "A(func='x', cmd_type='y')"
+    assert run(main, "--func", "z") == "A(func='z', cmd_type='y')"
+    assert run({main: "main", other: "other"}, "other", "--cmd_type", "q") == "other A(func='x', cmd_type='q')"
@@ -0,0 +1,87 @@
+import os
+import tempfile
+from dataclasses import dataclass, field
+
+from msup.record import pack, unpack, pack_many, unpack_many, write_records, recfield, RecordFile
+
+@dataclass
+class Point:
+    x: float
+    y: float
+    id: int
+
+@dataclass
+class Row:
+    id: int
+    score: float | None
+    ok: bool
+    tag: str = recfield(width=8, default="")
+    note: str | None = None
+    count: int | None = 0
+
+@dataclass
+class KwOnly:
+    a: int
+    b: float = field(kw_only=True, default=0.0)
+    c: str | None = field(kw_only=True, default=None)
+
+@dataclass
+class Derived:
+    a: int
+    b: float = field(kw_only=True, default=0.0)
+    double: int = field(init=False, default=0)
+    label: str = field(init=False, default="")
+
+    def __post_init__(self):
+        self.double = 2 * self.a
+        self.label = f"a={self.a}"
+
+@dataclass
+class Bad:
+    xs: list[int]
+
+if __name__ == "__main__":
+    p = Point(x=1.5, y=-2.0, id=3)
+    assert len(pack(p)) == 24
+    assert unpack(Point, pack(p)) == p
+
+    rows = [
+        Row(id=0, score=None, ok=True, tag="abc", note="héllo", count=None),
+        Row(id=1, score=0.25, ok=False, tag="12345678", note=None),
+        Row(id=2, score=3.0, ok=True, note=""),
+    ]
+    for r in rows:
+        assert unpack(Row, pack(r)) == r
+    assert unpack_many(Row, pack_many(rows)) == rows
+    assert unpack_many(Row, pack_many([], Row)) == []
+    assert unpack_many(Point, pack_many([p, p])) == [p, p]
+
+    k = KwOnly(1, b=2.0)
+    assert unpack(KwOnly, pack(k)) == k
+    k2 = KwOnly(1, b=2.0, c="x")
+    assert unpack_many(KwOnly, pack_many([k, k2])) == [k, k2]
+    d = Derived(3, b=1.5)
+    assert unpack(Derived, pack(d)) == d
+    assert len(pack(d)) == 16
+    assert unpack_many(Derived, pack_many([d])) == [d]
+
+    try:
+        pack(Row(id=0, score=None, ok=True, tag="123456789"))
+        raise AssertionError("expected ValueError")
+    except ValueError:
+        pass
+
+    try:
+        pack(Bad(xs=[1]))
+        raise AssertionError("expected TypeError")
+    except TypeError:
+        pass
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "rows.bin")
+        write_records(path, rows)
+        with RecordFile(Row, path) as rf:
+            assert len(rf) == 3
+            assert rf[1] == rows[1]
+            assert rf[-1] == rows[2]
+            assert list(rf) == rows
@@ -0,0 +1,125 @@
+import os
+import sys
+import time
+import signal
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TOOL = """
+import sys
+import time
+from dataclasses import dataclass
+from msup.cli import cli, cliarg
+
+@dataclass
+class SleepArgs:
+    out: str
+    n: float = 3
+
+@dataclass
+class WhoArgs:
+    who: str = cliarg(env="WHO", default="default")
+    num_workers: int = -1
+
+def sleep(args: SleepArgs):
+    time.sleep(args.n)
+    with open(args.out, "w") as out_f:
+        out_f.write("done")
+
+def who(args: WhoArgs):
+    print(f"who={args.who} num_workers={args.num_workers}")
+
+if __name__ == "__main__":
+    cli({sleep: "sleep", who: "who"}, serve=sys.argv[1] if len(sys.argv) > 1 and sys.argv[1].endswith(".sock") else None)
+"""
+
+def start_server(tool: str, path: str, **env_overrides) -> subprocess.Popen:
+    server = subprocess.Popen(
+        [sys.executable, tool, path],
+        env=dict(env, **env_overrides),
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    assert server.stderr.readline().startswith("[msup] serving on"), "server did not start"
+    return server
+
+def stop_server(server: subprocess.Popen):
+    server.terminate()
+    server.wait()
+    server.stderr.close()
+
+def run_client(path: str, *argv: str, **env_overrides) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-m", "msup.serve", path, *argv],
+        capture_output=True,
+        text=True,
+        env=dict(env, **env_overrides),
+    )
+
+if __name__ == "__main__":
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    env.pop("WHO", None)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tool = os.path.join(tmp_dir, "tool.py")
+        with open(tool, "w") as out_f:
+            out_f.write(TOOL)
+        path = os.path.join(tmp_dir, "msup.sock")
+
+        server = start_server(tool, path, WHO="server")
+        try:
+            result = run_client(path, "who", "--num_workers", "4")
+            assert result.returncode == 0, result.stderr
+            assert result.stdout == "who=default num_workers=4\n", result.stdout
+
+            # env backed defaults are resolved from the client's env, not the server's
+            result = run_client(path, "who", WHO="client")
+            assert result.stdout == "who=client num_workers=-1\n", result.stdout
+
+            # the server is still alive and argparse errors are streamed back with the exit code
+            result = run_client(path, "who", "--num_workers", "abc")
+            assert result.returncode == 2
+            assert "invalid int value" in result.stderr
+            assert server.poll() is None
+
+            # interrupting the client cancels the command
+            for sig in (signal.SIGINT, signal.SIGTERM, signal.SIGKILL):
+                marker = os.path.join(tmp_dir, f"done_{sig}")
+                client = subprocess.Popen(
+                    [sys.executable, "-m", "msup.serve", path, "sleep", "--out", marker, "--n", "2"],
+                    env=env,
+                    stderr=subprocess.PIPE,
+                    text=True,
+                )
+                time.sleep(0.5)
+                client.send_signal(sig)
+                assert client.wait(timeout=10) == (128 + sig if sig != signal.SIGKILL else -sig)
+                assert "Traceback" not in client.stderr.read()
+                client.stderr.close()
+                time.sleep(2.5)
+                assert not os.path.exists(marker), f"command was not cancelled on {sig!r}"
+
+            result = run_client(path, "sleep", "--out", os.path.join(tmp_dir, "done"), "--n", "0")
+            assert result.returncode == 0 and os.path.exists(os.path.join(tmp_dir, "done"))
+
+            # a second server refuses to take over the socket of a running one
+            second = subprocess.run([sys.executable, tool, path], env=env, capture_output=True, text=True, timeout=30)
+            assert second.returncode != 0
+            assert "in use by another running server" in second.stderr
+            assert server.poll() is None
+            assert run_client(path, "who").returncode == 0
+        finally:
+            stop_server(server)
+
+        # a stale socket (no server listening) is replaced
+        assert os.path.exists(path)
+        server = start_server(tool, path)
+        try:
+            assert run_client(path, "who").returncode == 0
+        finally:
+            stop_server(server)
+
+        # without serve=, the tool runs cold
+        result = subprocess.run([sys.executable, tool, "who"], env=dict(env, WHO="cold"), capture_output=True, text=True)
+        assert result.stdout == "who=cold num_workers=-1\n", result.stdout
@@ -0,0 +1,99 @@
+import pickle
+from dataclasses import dataclass, field
+from multiprocessing import Pool
+
+from msup.shm import to_shm, from_shm
+
+@dataclass
+class Foo:
+    a: int
+    b: int
+
+@dataclass
+class Sample:
+    idx: int
+    weight: float
+    valid: bool
+    name: str
+    xs: list[float]
+    ids: list[int]
+    foo: Foo | None = None
+
+@dataclass
+class Derived:
+    a: int
+    xs: list[int] = field(default_factory=list)
+    double: int = field(init=False, default=0)
+
+    def __post_init__(self):
+        self.double = 2 * self.a
+
+def _worker_sum(args):
+    name, i = args
+    with from_shm(Sample, name) as batch:
+        xs = batch.get(i, "xs")
+        result = (batch.get(i, "name"), sum(xs))
+        xs.release()
+    return result
+
+if __name__ == "__main__":
+    samples = [
+        Sample(idx=i, weight=i / 2, valid=i % 2 == 0, name=f"sample_ü{i}", xs=[float(j) for j in range(i)], ids=[i] * 3)
+        for i in range(10)
+    ]
+    samples[3].foo = Foo(a=1, b=2)
+
+    batch = to_shm(Sample, samples)
+    assert len(batch) == 10
+    assert batch.get(4, "idx") == 4
+    assert batch.get(-1, "idx") == 9
+    assert batch.get(3, "weight") == 1.5
+    assert batch.get(3, "valid") is False
+    assert batch.get(3, "name") == "sample_ü3"
+    assert batch.get(3, "foo") == Foo(a=1, b=2)
+    assert batch.get(2, "foo") is None
+
+    xs = batch.get(5, "xs")
+    assert isinstance(xs, memoryview)
+    assert xs.tolist() == [0.0, 1.0, 2.0, 3.0, 4.0]
+    assert batch.get(0, "xs").tolist() == []
+    xs.release()
+
+    col = batch.column("idx")
+    assert col.tolist() == list(range(10))
+    col.release()
+
+    s = batch[7]
+    assert s.idx == 7 and s.name == "sample_ü7" and s.ids == [7, 7, 7]
+    assert s == samples[7]
+
+    # an unreleased view keeps the batch open and usable
+    xs = batch.get(5, "xs")
+    try:
+        batch.close()
+        raise AssertionError("expected BufferError")
+    except BufferError:
+        pass
+    assert batch.get(5, "idx") == 5
+    xs.release()
+
+    # a batch unpickled (e.g. in a worker) is closed when garbage collected
+    worker_batch = pickle.loads(pickle.dumps(batch))
+    assert worker_batch[1] == samples[1]
+    del worker_batch
+
+    with Pool(2) as pool:
+        results = pool.map(_worker_sum, [(batch.name, i) for i in range(10)])
+    assert results == [(f"sample_ü{i}", sum(range(i))) for i in range(10)]
+
+    batch.close()
+    batch.unlink()
+
+    with to_shm(Derived, [Derived(3, [1, 2]), Derived(4)]) as derived:
+        assert derived[0] == Derived(3, [1, 2]) and derived[0].double == 6
+        assert derived[1] == Derived(4)
+        derived.unlink()
+
+    with to_shm(Sample, []) as empty:
+        assert len(empty) == 0
+        empty.unlink()
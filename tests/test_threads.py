@@ -0,0 +1,71 @@
+import gc
+import sys
+import json
+import importlib
+from dataclasses import dataclass, field, make_dataclass
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from msup.base import from_dict, to_dict, from_json, load_callable, clear_caches, _fields, _defaults
+from msup.record import pack, unpack, _layouts
+
+@dataclass
+class Inner:
+    xs: list[float]
+    name: str = "inner"
+
+def _make_classes(n: int) -> list[type]:
+    # NOTE: fresh classes so the per-class caches are populated concurrently
+    return [
+        make_dataclass(
+            f"Outer{i}",
+            [
+                ("a", int),
+                ("inner", Inner | None, field(default=None)),
+                ("meta", dict[str, int], field(default_factory=dict)),
+                ("fn", Callable, field(default="json.dumps")),
+            ],
+        )
+        for i in range(n)
+    ]
+
+def _work(classes: list[type]) -> bool:
+    for i in range(200):
+        clazz = classes[i % len(classes)]
+        d = {"a": i, "inner": {"xs": [1.0, float(i)]}, "meta": {"k": i}, "fn": "json.dumps"}
+        x = from_dict(clazz, d)
+        assert x.fn is load_callable("json.dumps")
+        assert to_dict(x) == dict(d, fn="dumps", inner={"xs": [1.0, float(i)], "name": "inner"})
+        assert from_json(clazz, json.dumps(d)) == x
+        assert to_dict(x, sparse=True) == {"a": i, "inner": {"xs": [1.0, float(i)]}, "meta": {"k": i}, "fn": "dumps"}
+    return True
+
+if __name__ == "__main__":
+    sys.setswitchinterval(1e-6)
+    classes = _make_classes(16)
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        assert all(pool.map(_work, [classes] * 64))
+
+    # classes created at runtime are not kept alive by the caches
+    n_fields, n_defaults = len(_fields), len(_defaults)
+    point = make_dataclass("Point", [("x", int), ("y", float)])
+    assert unpack(point, pack(point(1, 2.0))) == point(1, 2.0)
+    assert to_dict(point(1, 2.0), sparse=True) == {"x": 1, "y": 2.0}
+    n_layouts = len(_layouts)
+    del classes, point
+    gc.collect()
+    assert len(_fields) == n_fields - 16
+    assert len(_defaults) == n_defaults - 16
+    assert len(_layouts) == n_layouts - 1
+
+    # resolved callables are cached until clear_caches()
+    mod = importlib.import_module("json")
+    orig = mod.dumps
+    mod.dumps = lambda *args, **kwargs: "rebound"
+    try:
+        assert load_callable("json.dumps") is orig
+        clear_caches()
+        assert load_callable("json.dumps")() == "rebound"
+    finally:
+        mod.dumps = orig
+        clear_caches()